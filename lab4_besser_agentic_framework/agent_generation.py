@@ -1,19 +1,24 @@
-import streamlit as st
 import sys
-from streamlit.web import cli as stcli
 
-from agent_generation.generator.agent_manager import AgentManager
-from agent_generation.ui.agent_ui import agent_ui
-from agent_generation.ui.generator_ui import generator_ui
-from agent_generation.ui.sidebar import sidebar_menu
-from agent_generation.utils.utils import agent_selection
+if __name__ == "__main__":
+    # The generation pool workers import this script as __mp_main__, so the imports are kept here to keep them light
+    import streamlit as st
+    from streamlit.web import cli as stcli
 
-st.set_page_config(layout="wide")
+    from agent_generation.generator.agent_manager import AgentManager
+    from agent_generation.generator.job_manager import JobManager, get_job_pools
+    from agent_generation.ui.agent_ui import agent_ui
+    from agent_generation.ui.generator_ui import generator_ui
+    from agent_generation.ui.sidebar import sidebar_menu
+    from agent_generation.utils.utils import agent_selection
+
+    st.set_page_config(layout="wide")
 
-if __name__ == "__main__":
     if st.runtime.exists():
         if 'agent_manager' not in st.session_state:
             st.session_state['agent_manager'] = AgentManager()
+        if 'job_manager' not in st.session_state:
+            st.session_state['job_manager'] = JobManager(st.session_state['agent_manager'], *get_job_pools())
         with st.sidebar:
             page = sidebar_menu()
         if page == 'Generator':
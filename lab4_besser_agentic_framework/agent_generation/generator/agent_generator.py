@@ -1,16 +1,38 @@
-import importlib
+import functools
+import importlib.util
+import os
 
 import numpy as np
-import streamlit as st
 
 from pandas import DataFrame
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
+GENERATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.join(os.path.dirname(GENERATOR_DIR), 'agents')
+TEMPLATE_NAME = 'agent_generation.py.j2'
+# Compiled templates are persisted here, so they survive across app restarts
+TEMPLATE_CACHE_DIR = os.path.join(GENERATOR_DIR, '.jinja_cache')
 
-def generate_agent(agent_name: str, df: DataFrame):
-    st.subheader('Data preview')
-    st.dataframe(df)
+
+@functools.lru_cache(maxsize=None)
+def get_environment() -> Environment:
+    """Return the template environment shared by all render_agent calls in this process.
+
+    It is created on first use, so importing this module has no side effects. Jinja reloads a template only when its
+    file's mtime changes (auto_reload is on by default), and the bytecode cache saves recompiling it on restart.
+    """
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    except OSError:
+        # Read-only install: fall back to Jinja's default directory in the system temp dir
+        bytecode_cache = FileSystemBytecodeCache()
+    return Environment(loader=FileSystemLoader(GENERATOR_DIR), bytecode_cache=bytecode_cache)
+
+
+def render_agent(agent_name: str, df: DataFrame, module_name: str):
+    """Write the agent's code to agents/<module_name>.py. It can run in a worker process."""
     # EXERCISE
 
     data = {}
@@ -23,11 +45,21 @@ def generate_agent(agent_name: str, df: DataFrame):
     data = df.groupby('answer').apply(lambda x: x[['question']].to_dict(orient='records')).to_json()
 
 
-    env = Environment(loader=FileSystemLoader(''))
-    template = env.get_template('agent_generation/generator/agent_generation.py.j2')
-    rendered_code = template.render(data)
-    with open(f'agent_generation/agents/{agent_name}.py', 'w') as file:
-        file.write(rendered_code)
+    template = get_environment().get_template(TEMPLATE_NAME)
+    with open(os.path.join(AGENTS_DIR, f'{module_name}.py'), 'w') as file:
+        template.stream(data=data, agent_name=agent_name).dump(file)
+
+
+def load_agent(module_name: str):
+    """Load a generated agent module and return its agent.
 
-    gen_module = importlib.import_module(f'agent_generation.agents.{agent_name}')
+    The module is not added to sys.modules, so each load gets its own globals and never replaces those of an agent
+    that is already running.
+    """
+    spec = importlib.util.spec_from_file_location(
+        f'agent_generation.agents.{module_name}',
+        os.path.join(AGENTS_DIR, f'{module_name}.py'),
+    )
+    gen_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gen_module)
     return gen_module.agent
@@ -1,16 +1,36 @@
+import threading
+
 from besser.agent.core.agent import Agent
 from besser.agent.platforms.websocket import WEBSOCKET_PORT
 
 
 class AgentManager:
     port = 8765
+    # Agents are reserved and added concurrently from the generation jobs
+    _lock = threading.Lock()
 
     def __init__(self):
         self.agents: dict = {}
+        self._reserved: set = set()
+
+    def reserve_agent(self, agent: Agent):
+        """Reserve the name of an agent and set it a free websocket port, before running it"""
+        with AgentManager._lock:
+            if agent.name in self.agents or agent.name in self._reserved:
+                raise ValueError(f"Agent with name {agent.name} already exists")
+            self._reserved.add(agent.name)
+            agent.set_property(WEBSOCKET_PORT, AgentManager.port)
+            AgentManager.port += 1
+
+    def release_agent(self, agent: Agent):
+        """Release the name of a reserved agent that could not be run"""
+        with AgentManager._lock:
+            self._reserved.discard(agent.name)
 
     def add_agent(self, agent: Agent):
-        if agent.name in self.agents:
-            raise ValueError(f"Agent with name {agent.name} already exists")
-        agent.set_property(WEBSOCKET_PORT, AgentManager.port)
-        AgentManager.port += 1
-        self.agents[agent.name] = agent
+        """Publish a reserved agent once it is running, making it available in the UI"""
+        with AgentManager._lock:
+            if agent.name not in self._reserved:
+                raise ValueError(f"Agent with name {agent.name} has not been reserved")
+            self._reserved.remove(agent.name)
+            self.agents[agent.name] = agent
@@ -0,0 +1,182 @@
+import atexit
+import contextlib
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+from pandas import DataFrame
+
+from agent_generation.generator.agent_generator import load_agent, render_agent
+from agent_generation.generator.agent_manager import AgentManager
+
+QUEUED = 'Queued'
+GENERATING = 'Generating'
+GENERATED = 'Waiting for training'
+TRAINING = 'Training'
+RUNNING = 'Running'
+FAILED = 'Failed'
+
+# Progress (from 0 to 100) shown for each job status
+PROGRESS = {
+    QUEUED: 0,
+    GENERATING: 25,
+    GENERATED: 40,
+    TRAINING: 60,
+    RUNNING: 100,
+    FAILED: 100,
+}
+
+# Rendering an agent takes milliseconds, while starting a spawned worker means starting a new interpreter that imports
+# pandas, jinja2 and the entry script (whose heavy imports are kept under its __main__ guard). A few workers are enough
+GENERATION_WORKERS = 2
+
+
+class AgentNameError(ValueError):
+    """Raised when submitting a job for an agent name that is already taken"""
+
+
+class GenerationPool:
+    """Process pool that renders the agents' code, meant to be shared by all the sessions.
+
+    Workers are spawned rather than forked, since the streamlit process runs many threads. If a worker dies, the pool
+    is broken and it is rebuilt on the next submission.
+    """
+
+    def __init__(self, max_workers: int = GENERATION_WORKERS):
+        self._max_workers: int = max_workers
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor = self._new_executor()
+        atexit.register(self.shutdown)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self._max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            try:
+                return self._executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+                return self._executor.submit(fn, *args)
+
+    def shutdown(self):
+        with self._lock:
+            self._executor.shutdown(cancel_futures=True)
+
+
+@st.cache_resource
+def get_job_pools() -> tuple[GenerationPool, ThreadPoolExecutor]:
+    """Create the pools running the agent generation jobs, shared by all the sessions"""
+    training_pool = ThreadPoolExecutor(thread_name_prefix='agent_training')
+    atexit.register(training_pool.shutdown, cancel_futures=True)
+    return GenerationPool(), training_pool
+
+
+class Job:
+    """An agent generation and training job"""
+
+    def __init__(self, agent_name: str, df: DataFrame):
+        self.agent_name: str = agent_name
+        self.df: DataFrame = df
+        # Each job has its own agent module, so jobs for the same agent name (e.g. in different sessions) never
+        # overwrite each other's code
+        self.module_name: str = f'{agent_name}_{uuid.uuid4().hex[:8]}'
+        self.error: str = None
+        self.generation: Future = None
+        self._status: str = QUEUED
+
+    @property
+    def status(self) -> str:
+        # The generation pool marks a job as running once it hands it to a worker
+        if self._status == QUEUED and self.generation is not None and self.generation.running():
+            return GENERATING
+        return self._status
+
+    @status.setter
+    def status(self, status: str):
+        self._status = status
+
+    @property
+    def progress(self) -> int:
+        return PROGRESS[self.status]
+
+    @property
+    def done(self) -> bool:
+        return self.status in (RUNNING, FAILED)
+
+
+class JobManager:
+    """Generates and trains the agents of a session in the background.
+
+    The agent code is rendered in the generation pool. The generated agents are then trained in the training pool,
+    since they must run in this process to be registered in the agent manager and reached from the UI. An agent is only
+    added to the agent manager once it is running.
+    """
+
+    def __init__(self, agent_manager: AgentManager, generation_pool: GenerationPool, training_pool: ThreadPoolExecutor):
+        self.agent_manager: AgentManager = agent_manager
+        self.jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._generation_pool: GenerationPool = generation_pool
+        self._training_pool: ThreadPoolExecutor = training_pool
+
+    def _is_name_taken(self, agent_name: str) -> bool:
+        job = self.jobs.get(agent_name)
+        return (job is not None and job.status != FAILED) or agent_name in self.agent_manager.agents
+
+    def has_pending_jobs(self) -> bool:
+        with self._lock:
+            return any(not job.done for job in self.jobs.values())
+
+    def submit(self, agent_name: str, df: DataFrame) -> Job:
+        job = Job(agent_name=agent_name, df=df)
+        with self._lock:
+            if self._is_name_taken(agent_name):
+                raise AgentNameError(f"Agent with name {agent_name} already exists")
+            # The job is only registered if it could be submitted
+            job.generation = self._generation_pool.submit(render_agent, agent_name, df, job.module_name)
+            self.jobs[agent_name] = job
+        job.generation.add_done_callback(lambda f: self._on_generated(job, f))
+        return job
+
+    def _on_generated(self, job: Job, future: Future):
+        if future.exception() is not None:
+            self._fail(job, future.exception())
+            return
+        job.status = GENERATED
+        try:
+            self._training_pool.submit(self._train, job)
+        except RuntimeError as e:
+            # The training pool has been shut down
+            self._fail(job, e)
+
+    def _train(self, job: Job):
+        job.status = TRAINING
+        try:
+            agent = load_agent(job.module_name)
+            if agent.name != job.agent_name:
+                raise ValueError(f"The generated agent is named '{agent.name}' instead of '{job.agent_name}'")
+            self.agent_manager.reserve_agent(agent)
+        except Exception as e:
+            self._fail(job, e)
+            return
+        try:
+            agent.run(sleep=False)
+            self.agent_manager.add_agent(agent)
+        except Exception as e:
+            # Do not leave a half started agent holding its port
+            with contextlib.suppress(Exception):
+                agent.stop()
+            self.agent_manager.release_agent(agent)
+            self._fail(job, e)
+        else:
+            job.status = RUNNING
+
+    @staticmethod
+    def _fail(job: Job, error: BaseException):
+        job.error = str(error)
+        job.status = FAILED
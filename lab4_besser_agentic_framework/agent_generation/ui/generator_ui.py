@@ -1,32 +1,71 @@
+import os
+
 import pandas as pd
 import streamlit as st
 
-from agent_generation.generator.agent_generator import generate_agent
+from agent_generation.generator.job_manager import FAILED, RUNNING, AgentNameError
+
+# Time interval to refresh the status of the generation jobs while some are pending, in seconds.
+# Refreshing uses st.fragment, which requires streamlit>=1.37
+JOBS_REFRESH_INTERVAL = 2
 
 
 def generator_ui():
     st.header('Agent generator')
+    job_manager = st.session_state['job_manager']
     with st.form('upload_data', clear_on_submit=True):
-        st.subheader('Import a csv file')
-        agent_name = st.text_input(label='Agent name', placeholder='Example: sales_agent')
-        uploaded_file = st.file_uploader(label="Choose a file", type='csv')
-        submitted = st.form_submit_button(label="Create agent", type='primary')
+        st.subheader('Import csv files')
+        agent_name = st.text_input(label='Agent name (only for a single file)', placeholder='Example: sales_agent')
+        uploaded_files = st.file_uploader(label="Choose one or more files", type='csv', accept_multiple_files=True)
+        submitted = st.form_submit_button(label="Create agents", type='primary')
         if submitted:
-            if uploaded_file is None:
+            if not uploaded_files:
                 st.error('Please add a dataset')
             else:
-                if agent_name is None or agent_name == '':
-                    agent_name = uploaded_file.name[:-4]  # remove .csv file extension
-                if agent_name in st.session_state['agent_manager'].agents:
-                    st.error(f"The agent name '{agent_name}' already exists. Please choose another one")
-                else:
-                    with st.spinner('Generating the agent'):
-                        agent = generate_agent(agent_name, pd.read_csv(uploaded_file))
-                    if agent:
-                        st.info(f'The agent **{agent.name}** has been created!')
-                        with st.spinner('Training the agent'):
-                            st.session_state['agent_manager'].add_agent(agent)
-                            agent.run(sleep=False)
-                        st.info(f'The agent **{agent.name}** is now running!')
+                for uploaded_file in uploaded_files:
+                    name = os.path.splitext(uploaded_file.name)[0]
+                    if len(uploaded_files) == 1 and agent_name:
+                        name = agent_name
+                    try:
+                        df = pd.read_csv(uploaded_file)
+                    except Exception as e:
+                        st.error(f"The file '{uploaded_file.name}' could not be read: {e}")
+                        continue
+                    try:
+                        job_manager.submit(name, df)
+                    except AgentNameError:
+                        st.error(f"The agent name '{name}' already exists. Please choose another one")
+                    except Exception as e:
+                        st.error(f"The agent '{name}' could not be queued: {e}")
                     else:
-                        st.error('The agent was not generated')
+                        st.info(f'The agent **{name}** has been queued')
+    if job_manager.has_pending_jobs():
+        pending_jobs_ui()
+    else:
+        jobs_ui()
+
+
+@st.fragment(run_every=JOBS_REFRESH_INTERVAL)
+def pending_jobs_ui():
+    """Show the status of the agent generation jobs, refreshing it until all of them are done"""
+    if not st.session_state['job_manager'].has_pending_jobs():
+        # Rerun the whole app to stop refreshing
+        st.rerun()
+    jobs_ui()
+
+
+def jobs_ui():
+    """Show the status of the agent generation jobs"""
+    jobs = st.session_state['job_manager'].jobs
+    if not jobs:
+        return
+    st.subheader('Agents')
+    for job in reversed(list(jobs.values())):
+        with st.container(border=True):
+            st.progress(job.progress, text=f'**{job.agent_name}**: {job.status}')
+            if job.status == RUNNING:
+                st.info(f'The agent **{job.agent_name}** is now running!')
+            elif job.status == FAILED:
+                st.error(f'The agent was not generated: {job.error}')
+            with st.expander('Data preview'):
+                st.dataframe(job.df)